@@ -1,39 +1,199 @@
 import maya.cmds as cmds
+from maya.api import OpenMaya as om
 
 PLUGIN_NAME = "autoSkinWin"
 
-# --- Utility Functions ---
-def is_left_joint(joint):
-    return joint.lower().startswith(('l_', 'left'))
+# Last loaded selection per text field: (display text, object list).
+_FIELD_CACHE = {}
 
-def is_right_joint(joint):
-    return joint.lower().startswith(('r_', 'right'))
+_LEFT_PREFIXES = ('l_', 'left')
+_RIGHT_PREFIXES = ('r_', 'right')
 
+# --- Utility Functions ---
 def get_mirror_direction(joints):
-    if any(is_left_joint(j) for j in joints):
-        return 'leftToRight'
-    elif any(is_right_joint(j) for j in joints):
-        return 'rightToLeft'
+    # Single pass; a left joint anywhere still wins over a right joint.
+    has_right = False
+    for joint in joints:
+        name = joint.lower()
+        if name.startswith(_LEFT_PREFIXES):
+            return 'leftToRight'
+        if name.startswith(_RIGHT_PREFIXES):
+            has_right = True
+    return 'rightToLeft' if has_right else None
+
+def strip_side_prefix(name, prefixes):
+    # Expects an already lowercased name.
+    for prefix in prefixes:
+        if name.startswith(prefix):
+            return name[len(prefix):].lstrip('_')
     return None
 
-def is_valid_mesh(obj):
-    if cmds.objectType(obj) != 'transform':
+def has_mirrored_pairs(joints):
+    # True if at least one left joint has a right joint with the same base name.
+    names = [j.lower() for j in joints]
+    left_bases = {strip_side_prefix(n, _LEFT_PREFIXES) for n in names}
+    left_bases.discard(None)
+    if not left_bases:
         return False
-    shapes = cmds.listRelatives(obj, shapes=True, type='mesh')
-    return bool(shapes)
+    return any(strip_side_prefix(n, _RIGHT_PREFIXES) in left_bases for n in names)
 
-def is_valid_joint(obj):
-    return cmds.objectType(obj) == 'joint'
-
-def auto_skin_weights(selected_joints, selected_meshes, max_influences=4, mirror_axis='YZ'):
+def get_selection_list(name):
+    # One selection list per name keeps results keyed by the name given;
+    # missing or ambiguous names return None.
+    sel = om.MSelectionList()
+    try:
+        sel.add(name)
+    except RuntimeError:
+        return None
+    if sel.length() != 1:
+        return None
+    return sel
+
+def get_mesh_shapes(dag_path):
+    fn = om.MFnDagNode(dag_path)
+    return [fn.child(i) for i in range(fn.childCount()) if fn.child(i).hasFn(om.MFn.kMesh)]
+
+def get_valid_meshes(objs):
+    # Maps each valid mesh name to its resolved MDagPath.
+    valid = {}
+    for obj in objs:
+        sel = get_selection_list(obj)
+        if sel is None or sel.getDependNode(0).apiType() != om.MFn.kTransform:
+            continue
+        dag_path = sel.getDagPath(0)
+        if get_mesh_shapes(dag_path):
+            valid[obj] = dag_path
+    return valid
+
+def get_valid_joints(objs):
+    valid = set()
+    for obj in objs:
+        sel = get_selection_list(obj)
+        if sel is not None and sel.getDependNode(0).hasFn(om.MFn.kJoint):
+            valid.add(obj)
+    return valid
+
+def get_skin_clusters(dag_path):
+    # skinClusters in the deformation chain of the mesh's shapes. Like
+    # findRelatedSkinCluster (listHistory -pruneDagObjects), the walk stops at
+    # other DAG nodes so wrap/blendShape targets' own history isn't visited.
+    skins = []
+    for shape in get_mesh_shapes(dag_path):
+        it = om.MItDependencyGraph(shape, om.MFn.kInvalid, om.MItDependencyGraph.kUpstream)
+        while not it.isDone():
+            node = it.currentNode()
+            if node.hasFn(om.MFn.kSkinClusterFilter):
+                name = om.MFnDependencyNode(node).name()
+                if name not in skins:
+                    skins.append(name)
+            elif node.hasFn(om.MFn.kDagNode) and node != shape:
+                it.prune()
+            it.next()
+    return skins
+
+def delete_stale_skins(stale_skins):
+    # Delete every replaced skinCluster in one call; fall back to one call per
+    # mesh so a locked or referenced skinCluster only skips its own mesh.
+    # stale_skins maps mesh -> skinClusters; returns the meshes cleared.
+    if not stale_skins:
+        return []
+    try:
+        # A skinCluster shared by several meshes is only listed once.
+        cmds.delete(list(dict.fromkeys(s for skins in stale_skins.values() for s in skins)))
+        return list(stale_skins)
+    except Exception as e:
+        cmds.warning(f"Batched skinCluster delete failed, deleting per mesh: {e}")
+
+    cleared = []
+    for mesh, skins in stale_skins.items():
+        try:
+            # The failed batch may already have removed some of them.
+            remaining = cmds.ls(skins)
+            if remaining:
+                cmds.delete(remaining)
+            cleared.append(mesh)
+        except Exception as e:
+            cmds.warning(f"Could not delete the existing skinCluster on {mesh}, skipping it: {e}")
+    return cleared
+
+def bind_meshes(joints, meshes, max_influences, mesh_paths):
+    # Bind every mesh in one skinCluster call; fall back to one call per mesh
+    # so a single bad mesh doesn't fail the whole batch.
+    def bind(targets):
+        cmds.skinCluster(
+            joints,
+            targets,
+            toSelectedBones=True,
+            normalizeWeights=1,
+            bindMethod=0,
+            skinMethod=0,
+            dropoffRate=4.0,
+            maximumInfluences=max_influences
+        )
+
+    if not meshes:
+        return []
+    try:
+        bind(meshes)
+        return list(meshes)
+    except Exception as e:
+        cmds.warning(f"Batched skinCluster failed, binding per mesh: {e}")
+
+    skinned = []
+    for mesh in meshes:
+        # Commands don't roll back, so the failed batch may already have bound
+        # this mesh; any old skinCluster was deleted before binding.
+        if get_skin_clusters(mesh_paths[mesh]):
+            skinned.append(mesh)
+            continue
+        try:
+            bind([mesh])
+            skinned.append(mesh)
+        except Exception as e:
+            cmds.warning(f"Error skinning {mesh}: {e}")
+    return skinned
+
+def mirror_meshes(meshes, mirror_axis, mirror_direction):
+    # Same batching strategy as bind_meshes for mirrorSkinWeights.
+    def mirror(targets):
+        cmds.mirrorSkinWeights(
+            targets,
+            mirrorMode=mirror_axis,
+            direction=mirror_direction,
+            surfaceAssociation='closestPoint',
+            influenceAssociation=['name']
+        )
+
+    if not meshes:
+        return []
+    try:
+        mirror(meshes)
+        return list(meshes)
+    except Exception as e:
+        cmds.warning(f"Batched mirrorSkinWeights failed, mirroring per mesh: {e}")
+
+    # Mirroring a mesh again just rewrites the same weights, so meshes the
+    # failed batch already mirrored are safe to retry.
+    mirrored = []
+    for mesh in meshes:
+        try:
+            mirror([mesh])
+            mirrored.append(mesh)
+        except Exception as e:
+            cmds.warning(f"Could not mirror skin weights for {mesh}: {e}")
+    return mirrored
+
+def auto_skin_weights(selected_joints, selected_meshes, max_influences=4, mirror_axis='YZ', replace_existing=True):
     if not selected_joints or not selected_meshes:
         cmds.warning("Please select at least one joint and one or more meshes.")
         return
 
-    valid_joints = [j for j in selected_joints if is_valid_joint(j)]
-    invalid_joints = [j for j in selected_joints if not is_valid_joint(j)]
-    valid_meshes = [m for m in selected_meshes if is_valid_mesh(m)]
-    invalid_meshes = [m for m in selected_meshes if not is_valid_mesh(m)]
+    joint_set = get_valid_joints(selected_joints)
+    mesh_paths = get_valid_meshes(selected_meshes)
+    valid_joints = [j for j in selected_joints if j in joint_set]
+    invalid_joints = [j for j in selected_joints if j not in joint_set]
+    valid_meshes = [m for m in selected_meshes if m in mesh_paths]
+    invalid_meshes = [m for m in selected_meshes if m not in mesh_paths]
 
     if invalid_joints:
         cmds.warning("Invalid joints: {}".format(", ".join(invalid_joints)))
@@ -44,57 +204,65 @@ def auto_skin_weights(selected_joints, selected_meshes, max_influences=4, mirror
         cmds.warning("Aborting due to invalid selections.")
         return
 
-    mirror_direction = get_mirror_direction(valid_joints)
+    # Decided once for the whole batch; mirror_axis=None disables mirroring.
+    mirror_direction = get_mirror_direction(valid_joints) if mirror_axis else None
+    if mirror_direction and not has_mirrored_pairs(valid_joints):
+        mirror_direction = None
+
+    existing_skins = {mesh: get_skin_clusters(mesh_paths[mesh]) for mesh in valid_meshes}
+
+    meshes_to_skin = []
+    stale_skins = {}
+    kept_meshes = []
+    for mesh in valid_meshes:
+        if existing_skins[mesh]:
+            if not replace_existing:
+                kept_meshes.append(mesh)
+                continue
+            stale_skins[mesh] = existing_skins[mesh]
+        meshes_to_skin.append(mesh)
+
+    if kept_meshes:
+        cmds.warning("Kept existing skinClusters on: {}".format(", ".join(kept_meshes)))
+    if not meshes_to_skin:
+        cmds.warning("No meshes left to skin.")
+        return
 
+    # Parallel evaluation and viewport redraws would otherwise react to every
+    # deformer created below; both are restored once the batch is done.
+    eval_mode = (cmds.evaluationManager(query=True, mode=True) or ['off'])[0]
+    if eval_mode != 'off':
+        cmds.evaluationManager(mode='off')
+    cmds.refresh(suspend=True)
     cmds.undoInfo(openChunk=True)
+    skinned_meshes = []
+    mirrored_meshes = []
     try:
-        for mesh in valid_meshes:
-            try:
-                existing_skin = cmds.ls(cmds.listHistory(mesh), type='skinCluster')
-                if existing_skin:
-                    result = cmds.confirmDialog(
-                        title="Replace SkinCluster?",
-                        message=f"{mesh} already has a skinCluster. Delete and replace?",
-                        button=["Yes", "No"], defaultButton="Yes", cancelButton="No", dismissString="No"
-                    )
-                    if result == "No":
-                        continue
-                    cmds.delete(existing_skin)
-
-                cmds.skinCluster(
-                    valid_joints,
-                    mesh,
-                    toSelectedBones=True,
-                    normalizeWeights=1,
-                    bindMethod=0,
-                    skinMethod=0,
-                    dropoffRate=4.0,
-                    maximumInfluences=max_influences
-                )
-                cmds.inViewMessage(amg=f"<hl>Skinned:</hl> {mesh}", pos='midCenter', fade=True)
-
-                if mirror_direction:
-                    try:
-                        cmds.mirrorSkinWeights(
-                            mesh,
-                            mirrorMode=mirror_axis,
-                            direction=mirror_direction,
-                            surfaceAssociation='closestPoint',
-                            influenceAssociation=['name']
-                        )
-                        cmds.inViewMessage(amg=f"<hl>Mirrored:</hl> {mesh}", pos='midCenter', fade=True)
-                    except Exception as e:
-                        cmds.warning(f"Could not mirror skin weights for {mesh}: {e}")
-                else:
-                    cmds.inViewMessage(amg=f"<hl>Skipped mirroring for:</hl> {mesh}", pos='midCenter', fade=True)
-            except Exception as e:
-                cmds.warning(f"Error skinning {mesh}: {e}")
+        cleared = set(delete_stale_skins(stale_skins))
+        meshes_to_skin = [m for m in meshes_to_skin if m not in stale_skins or m in cleared]
+
+        skinned_meshes = bind_meshes(valid_joints, meshes_to_skin, max_influences, mesh_paths)
+        if mirror_direction:
+            mirrored_meshes = mirror_meshes(skinned_meshes, mirror_axis, mirror_direction)
     finally:
         cmds.undoInfo(closeChunk=True)
+        cmds.refresh(suspend=False)
+        if eval_mode != 'off':
+            cmds.evaluationManager(mode=eval_mode)
+        cmds.refresh(force=True)
+
+    skipped_count = len(valid_meshes) - len(skinned_meshes)
+    cmds.inViewMessage(
+        amg=f"<hl>Done:</hl> skinned {len(skinned_meshes)}, mirrored {len(mirrored_meshes)}, skipped {skipped_count}",
+        pos='midCenter', fade=True
+    )
 
 # --- UI Functions ---
-def build_ui():
+def build_ui(reset=False):
     if cmds.window(PLUGIN_NAME, exists=True):
+        if not reset:
+            cmds.showWindow(PLUGIN_NAME)
+            return
         cmds.deleteUI(PLUGIN_NAME)
 
     window = cmds.window(PLUGIN_NAME, title="\u2728 Auto Skin Weights Plugin", widthHeight=(300, 350))
@@ -116,47 +284,81 @@ def build_ui():
 
     cmds.text(label="Mirror Axis:", align='left')
     cmds.optionMenu("mirrorAxisMenu", label="", width=100)
-    for axis in ["YZ", "XY", "XZ"]:
+    for axis in ["YZ", "XY", "XZ", "None"]:
         cmds.menuItem(label=axis)
 
+    cmds.checkBox("replaceExistingCB", label="Replace existing skinClusters", value=True)
+
     cmds.separator(height=10, style='in')
 
     cmds.button(label="\ud83c\udfaf Auto Skin All Meshes!", height=40, command=lambda *args: run_auto_skin())
+    # Deferred so the window isn't deleted from inside its own button callback.
+    cmds.button(label="Reset UI", height=20, command=lambda *args: cmds.evalDeferred(lambda: build_ui(reset=True)))
 
     cmds.setParent('..')
     cmds.showWindow(window)
 
-    load_selection_to_field("jointField", multi=True)
-    load_selection_to_field("meshField", multi=True)
+    # Let the window paint before querying the scene selection.
+    cmds.evalDeferred(prefill_fields)
 
-def load_selection_to_field(field_name, multi=True):
+def prefill_fields():
     selection = cmds.ls(selection=True)
+    if not selection:
+        return
+    load_selection_to_field("jointField", multi=True, selection=selection)
+    load_selection_to_field("meshField", multi=True, selection=selection)
+
+def load_selection_to_field(field_name, multi=True, selection=None):
+    if selection is None:
+        selection = cmds.ls(selection=True)
     if not selection:
         cmds.warning("Nothing selected.")
         return
     if not multi and len(selection) > 1:
         cmds.warning("Please select only one item.")
         return
-    cmds.textFieldButtonGrp(field_name, edit=True, text=",".join(selection))
+    text = ",".join(selection)
+    _FIELD_CACHE[field_name] = (text, list(selection))
+    cmds.textFieldButtonGrp(field_name, edit=True, text=text)
+
+def read_field_selection(field_name, text, label):
+    # Reuse the loaded list unless the user has edited the field since.
+    cached = _FIELD_CACHE.get(field_name)
+    if cached and cached[0] == text:
+        return list(cached[1])
+    # Typed names: dedupe, resolve them all with one ls call, then report the
+    # names ls returned nothing for.
+    names = list(dict.fromkeys(name for name in (item.strip() for item in text.split(",")) if name))
+    if not names:
+        return []
+    resolved = cmds.ls(names, long=False) or []
+    missing = [n for n in names
+               if not any(r == n or r.endswith('|' + n) or n.endswith('|' + r) for r in resolved)]
+    if missing:
+        cmds.warning("{} not found: {}".format(label.capitalize(), ", ".join(missing)))
+    return resolved
 
 def run_auto_skin():
     joints_text = cmds.textFieldButtonGrp("jointField", query=True, text=True)
     meshes_text = cmds.textFieldButtonGrp("meshField", query=True, text=True)
     max_influences = cmds.intSliderGrp("influenceSlider", query=True, value=True)
     mirror_axis = cmds.optionMenu("mirrorAxisMenu", query=True, value=True)
+    replace_existing = cmds.checkBox("replaceExistingCB", query=True, value=True)
+    if mirror_axis == "None":
+        mirror_axis = None
 
     if not joints_text or not meshes_text:
         cmds.warning("Please load joints and meshes.")
         return
 
-    selected_joints = [j.strip() for j in joints_text.split(",") if j.strip()]
-    selected_meshes = [m.strip() for m in meshes_text.split(",") if m.strip()]
+    selected_joints = read_field_selection("jointField", joints_text, "joints")
+    selected_meshes = read_field_selection("meshField", meshes_text, "meshes")
 
-    auto_skin_weights(selected_joints, selected_meshes, max_influences, mirror_axis)
+    auto_skin_weights(selected_joints, selected_meshes, max_influences, mirror_axis, replace_existing=replace_existing)
 
 # --- Entry Point for Maya ---
-def launch_auto_skin_plugin():
-    build_ui()
+def launch_auto_skin_plugin(reset=False):
+    build_ui(reset)
 
 # Call this to start UI if script is run directly
 if __name__ == '__main__':